@@ -1,40 +1,55 @@
+import csv
 import os
 import re
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from typing import List, Dict, Any
 
-def parse_time_to_seconds(time_str: str) -> float:
+# Read buffer size for streaming large cleaned files
+BUFFER_SIZE = 1 << 20
+
+# Pattern to match quiz result lines
+# Matches: 🥇/@username, 🥈/@username, 🥉/@username, or numbered positions
+_RESULT_RE = re.compile(r'^\s*(?:🥇|🥈|🥉|\d+\.)\s*(@\S+|[^\u2013\n]+)\s*\u2013\s*(\d+)\s*\((.*?)\)')
+
+# Time components, searched independently so each is found anywhere in the string
+_MIN_RE = re.compile(r'(\d+)\s*min')
+_SEC_RE = re.compile(r'(\d+(?:\.\d+)?)\s*sec')
+
+# Star ratings: one star per 10 points of final score, 1 to 10 stars
+_STAR_BINS = np.array([10, 20, 30, 40, 50, 60, 70, 80, 90])
+_STAR_LABELS = np.array([f"{stars}🌟" for stars in range(1, 11)])
+
+def parse_time_to_tenths(time_str: str) -> int:
     """
-    Convert time strings like '1 min 35 sec' or '45.6 sec' to float seconds.
+    Convert time strings like '1 min 35 sec' or '45.6 sec' to integer tenths of a second.
+    
+    Quiz times carry at most one decimal, so tenths keep sums and averages exact.
     
     Args:
         time_str: Time string in various formats
         
     Returns:
-        float: Time in seconds
+        int: Time in tenths of a second
     """
     if not time_str or not isinstance(time_str, str):
-        return 0.0
+        return 0
         
-    time_str = time_str.lower().strip()
-    total_seconds = 0.0
+    time_str = time_str.lower()
+    total_tenths = 0
     
-    try:
-        # Handle 'X min Y sec'
-        min_match = re.search(r'(\d+)\s*min', time_str)
-        if min_match:
-            total_seconds += int(min_match.group(1)) * 60
+    # Handle 'X min Y sec'
+    min_match = _MIN_RE.search(time_str)
+    if min_match:
+        total_tenths += int(min_match.group(1)) * 600
+    
+    # Handle 'X.X sec' or 'X sec'
+    sec_match = _SEC_RE.search(time_str)
+    if sec_match:
+        total_tenths += round(float(sec_match.group(1)) * 10)
         
-        # Handle 'X.X sec' or 'X sec'
-        sec_match = re.search(r'(\d+(?:\.\d+)?)\s*sec', time_str)
-        if sec_match:
-            total_seconds += float(sec_match.group(1))
-            
-        return total_seconds
-    except (ValueError, AttributeError) as e:
-        print(f"Error parsing time string '{time_str}': {e}")
-        return 0.0
+    return total_tenths
 
 def parse_quiz_results(file_path: str) -> List[Dict[str, Any]]:
     """
@@ -53,50 +68,79 @@ def parse_quiz_results(file_path: str) -> List[Dict[str, Any]]:
         List of dictionaries with quiz result data
     """
     quiz_results = []
-    
-    # Pattern to match quiz result lines
-    # Matches: 🥇/@username, 🥈/@username, 🥉/@username, or numbered positions
-    result_pattern = re.compile(r'^\s*(?:🥇|🥈|🥉|\d+\.)\s*(@\S+|[^\u2013\n]+)\s*\u2013\s*(\d+)\s*\((.*?)\)')
+    line_num = 0
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        for line_num, line in enumerate(lines, 1):
-            line = line.strip()
-            if not line:
-                continue
-                
-            match = result_pattern.match(line)
-            if match:
-                try:
-                    username = match.group(1).strip().replace('@', '')
-                    score = int(match.group(2))
-                    time_raw = match.group(3)
-                    time_sec = parse_time_to_seconds(time_raw)
+        with open(file_path, 'r', encoding='utf-8', buffering=BUFFER_SIZE) as f:
+            for line_num, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
                     
-                    # Validate data
-                    if username and score >= 0 and time_sec >= 0:
-                        quiz_results.append({
-                            'Username': username,
-                            'Score': score,
-                            'Seconds': time_sec,
-                            'Time_Raw': time_raw
-                        })
-                    else:
-                        print(f"Warning: Invalid data on line {line_num}: '{line}'")
+                match = _RESULT_RE.match(line)
+                if match:
+                    try:
+                        # Telegram handles only carry '@' as their first character
+                        username = match.group(1).strip()
+                        if username.startswith('@'):
+                            username = username[1:]
+                        score = int(match.group(2))
+                        time_raw = match.group(3)
+                        time_tenths = parse_time_to_tenths(time_raw)
                         
-                except (ValueError, AttributeError) as e:
-                    print(f"Error parsing line {line_num}: '{line}' - {e}")
-                    continue
+                        # Validate data
+                        if username and score >= 0 and time_tenths >= 0:
+                            quiz_results.append({
+                                'Username': username,
+                                'Score': score,
+                                'Tenths': time_tenths,
+                                'Time_Raw': time_raw
+                            })
+                        else:
+                            print(f"Warning: Invalid data on line {line_num}: '{line}'")
+                            
+                    except (ValueError, AttributeError) as e:
+                        print(f"Error parsing line {line_num}: '{line}' - {e}")
+                        continue
 
-        print(f"Successfully parsed {len(quiz_results)} quiz results from {len(lines)} lines")
+        print(f"Successfully parsed {len(quiz_results)} quiz results from {line_num} lines")
         return quiz_results
         
     except Exception as e:
         print(f"Error reading file {file_path}: {e}")
         return []
 
+def _accumulate(quiz_results: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Aggregate quiz results per username in a single pass.
+    
+    Args:
+        quiz_results: List of individual quiz results
+        
+    Returns:
+        DataFrame with one row per username (sorted by username) holding
+        participation count, total score and total time in tenths of a second
+    """
+    counts: Dict[str, int] = {}
+    sums: Dict[str, int] = {}
+    tenths: Dict[str, int] = {}
+    
+    for result in quiz_results:
+        username = result['Username']
+        counts[username] = counts.get(username, 0) + 1
+        sums[username] = sums.get(username, 0) + result['Score']
+        tenths[username] = tenths.get(username, 0) + result['Tenths']
+    
+    usernames = sorted(counts)
+    n = len(usernames)
+    # Explicit compact dtypes; times are summed as exact integer tenths
+    return pd.DataFrame({
+        'Username': pd.array(usernames, dtype='string'),
+        'Quizzes_Participated': np.fromiter((counts[u] for u in usernames), dtype=np.int32, count=n),
+        'Total_Score': np.fromiter((sums[u] for u in usernames), dtype=np.int32, count=n),
+        'Total_Tenths': np.fromiter((tenths[u] for u in usernames), dtype=np.int32, count=n)
+    })
+
 def calculate_cumulative_leaderboard(quiz_results: List[Dict[str, Any]]) -> pd.DataFrame:
     """
     Calculate cumulative leaderboard from individual quiz results.
@@ -117,19 +161,12 @@ def calculate_cumulative_leaderboard(quiz_results: List[Dict[str, Any]]) -> pd.D
         print("No quiz results to process")
         return pd.DataFrame()
 
-    # Convert to DataFrame for easier manipulation
-    df = pd.DataFrame(quiz_results)
-    
     # Group by username and calculate aggregates
-    agg_df = df.groupby('Username').agg(
-        Quizzes_Participated=('Score', 'count'),
-        Total_Score=('Score', 'sum'),
-        Total_Seconds=('Seconds', 'sum')
-    ).reset_index()
+    agg_df = _accumulate(quiz_results)
     
     # Calculate averages
     agg_df['Avg_Points'] = agg_df['Total_Score'] / agg_df['Quizzes_Participated']
-    agg_df['Avg_Time'] = agg_df['Total_Seconds'] / agg_df['Quizzes_Participated']
+    agg_df['Avg_Time'] = agg_df['Total_Tenths'] / agg_df['Quizzes_Participated'] / 10.0
     
     # Calculate weighted scores with safety checks
     max_participation = agg_df['Quizzes_Participated'].max()
@@ -142,50 +179,29 @@ def calculate_cumulative_leaderboard(quiz_results: List[Dict[str, Any]]) -> pd.D
     agg_df['Accuracy_Score'] = (agg_df['Avg_Points'] / max_avg_points * 25) if max_avg_points > 0 else 0
     
     # Speed Score (25% weight): Based on average completion time
-    def calculate_speed_score(avg_time):
-        if avg_time <= 50:  # Excellent speed (under 50 seconds)
-            return 25.0
-        # Slower speed gets lower score (inverse relationship)
-        return (50 / avg_time) * 25 if avg_time > 0 else 0
-
-    agg_df['Speed_Score'] = agg_df['Avg_Time'].apply(calculate_speed_score)
+    # Excellent speed (under 50 seconds) gets full marks, slower speed gets
+    # lower score (inverse relationship)
+    avg_time = agg_df['Avg_Time'].to_numpy()
+    agg_df['Speed_Score'] = np.where(avg_time <= 50, 25.0, (50 / np.maximum(avg_time, 50)) * 25)
     
     # Final Score: Sum of all weighted components
     agg_df['Final_Score'] = agg_df['Participation_Score'] + agg_df['Accuracy_Score'] + agg_df['Speed_Score']
     
-    # Sort by multiple criteria for deterministic ranking
-    agg_df = agg_df.sort_values(
-        by=['Final_Score', 'Avg_Points', 'Avg_Time', 'Quizzes_Participated'],
-        ascending=[False, False, True, False]
-    )
+    # Sort by multiple criteria for deterministic ranking: Final_Score, Avg_Points
+    # and Quizzes_Participated descending, Avg_Time ascending (lexsort's last key is primary)
+    order = np.lexsort((
+        -agg_df['Quizzes_Participated'].to_numpy(),
+        agg_df['Avg_Time'].to_numpy(),
+        -agg_df['Avg_Points'].to_numpy(),
+        -agg_df['Final_Score'].to_numpy()
+    ))
+    agg_df = agg_df.iloc[order].reset_index(drop=True)
     
     # Add rank
-    agg_df['Rank'] = range(1, len(agg_df) + 1)
+    agg_df['Rank'] = np.arange(1, len(agg_df) + 1, dtype=np.int32)
     
     # Add star ratings based on final score
-    def get_star_rating(score):
-        if score >= 90: 
-            return "10🌟"  # 10 stars
-        elif score >= 80: 
-            return "9🌟"     # 9 stars
-        elif score >= 70: 
-            return "8🌟"        # 8 stars
-        elif score >= 60: 
-            return "7🌟"           # 7 stars
-        elif score >= 50: 
-            return "6🌟"              # 6 stars
-        elif score >= 40: 
-            return "5🌟"                 # 5 stars
-        elif score >= 30: 
-            return "4🌟"                    # 4 stars
-        elif score >= 20: 
-            return "3🌟"                       # 3 stars
-        elif score >= 10: 
-            return "2🌟"                          # 2 stars
-        else: 
-            return "1🌟"                             # 1 star
-
-    agg_df['Remark'] = agg_df['Final_Score'].apply(get_star_rating)
+    agg_df['Remark'] = _STAR_LABELS[np.digitize(agg_df['Final_Score'].to_numpy(), _STAR_BINS)]
     
     # Select and reorder columns for final output
     final_columns = ['Rank', 'Username', 'Quizzes_Participated', 'Avg_Points', 'Avg_Time', 'Final_Score', 'Remark']
@@ -198,6 +214,25 @@ def calculate_cumulative_leaderboard(quiz_results: List[Dict[str, Any]]) -> pd.D
     
     return result_df
 
+def _write_leaderboard_csv(leaderboard_df: pd.DataFrame, output_file: str) -> None:
+    """
+    Write the leaderboard to CSV without going through DataFrame.to_csv.
+    
+    Columns are pulled out as plain Python lists and written with the csv
+    module in one call, which formats values the same way as to_csv.
+    
+    Args:
+        leaderboard_df: Leaderboard as returned by calculate_cumulative_leaderboard
+        output_file: Output CSV path
+    """
+    columns = list(leaderboard_df.columns)
+    rows = zip(*(leaderboard_df[column].tolist() for column in columns))
+    
+    with open(output_file, 'w', encoding='utf-8', newline='', buffering=BUFFER_SIZE) as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(columns)
+        writer.writerows(rows)
+
 def convert_to_csv(input_file: str, output_file: str = None) -> str:
     """
     Convert cleaned quiz data to cumulative leaderboard CSV.
@@ -232,7 +267,7 @@ def convert_to_csv(input_file: str, output_file: str = None) -> str:
     
     # Save to CSV
     try:
-        leaderboard_df.to_csv(output_file, index=False, encoding='utf-8')
+        _write_leaderboard_csv(leaderboard_df, output_file)
         print(f"Successfully saved leaderboard to: {output_file}")
         print(f"Total participants: {len(leaderboard_df)}")
         
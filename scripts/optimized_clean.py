@@ -4,115 +4,129 @@ import sys
 import re
 from pathlib import Path
 
+# Read/write buffer size for streaming large raw exports
+BUFFER_SIZE = 1 << 20
+
+# Cleaned lines are joined into chunks of about this many characters per write
+WRITE_CHUNK_SIZE = 1 << 16
+
+# Pattern to match quiz result lines (shared with convert_to_csv.py)
+_RESULT_RE = re.compile(r'^\s*(?:🥇|🥈|🥉|\d+\.)\s*(@\S+|[^\u2013\n]+)\s*\u2013\s*(\d+)\s*\((.*?)\)')
+
+# Numbered position prefix, e.g. '4.', matched against stripped lines
+_NUMBER_RE = re.compile(r'\d+\.')
+
+# UTF-8 encoded markers for filtering raw lines before decoding
+_REMOVE_PREFIXES = tuple(prefix.encode('utf-8') for prefix in ('🖊', '🏆', '⏱', '🤓'))
+_CHAPTER_HEADER = 'ምዕራፍ'.encode('utf-8')
+
+# Leading whitespace that str.strip() removes but bytes.strip() does not
+# (e.g. NBSP), and the first bytes that can start such a sequence
+_UNICODE_SPACE_RE = re.compile(
+    rb'(?:[\s\x1c-\x1f]|\xc2[\x85\xa0]|\xe1\x9a\x80|\xe2\x80[\x80-\x8a\xa8\xa9\xaf]|\xe2\x81\x9f|\xe3\x80\x80)+'
+)
+_UNICODE_SPACE_LEADS = frozenset(b'\x1c\x1d\x1e\x1f\xc2\xe1\xe2\xe3')
+
 def create_processed_folder():
     """Create the processed folder if it doesn't exist."""
     processed_dir = Path(__file__).parent.parent / "data" / "processed"
     processed_dir.mkdir(exist_ok=True)
     return processed_dir
 
-def remove_metadata_lines(lines):
+def get_line_type(text, stripped=None):
+    """
+    Classify line type for formatting purposes.
+    Pass the already stripped text as stripped to avoid stripping again.
+    """
+    if stripped is None:
+        stripped = text.strip()
+    if not stripped:
+        return 'EMPTY'
+    if stripped.startswith('🥇'):
+        return 'GOLD'
+    # Cheap first-character check before running the regex
+    if stripped[:1].isdigit() and _NUMBER_RE.match(stripped):
+        return 'NUMBER'
+    return 'OTHER'
+
+def process_lines(lines, stats):
     """
-    Removes lines starting with specific metadata emojis and headers.
-    Preserves quiz result lines and relevant content.
+    Cleans, formats and validates quiz lines in a single pass.
+    
+    1. Removes lines starting with specific metadata emojis and headers.
+       Raw UTF-8 byte lines are filtered before decoding, so only kept
+       lines pay for the decode.
+    2. Manages spacing between lines:
+       - Between a Numbered line and a Gold (🥇) line: Force 2 empty lines.
+       - Between consecutive numbered lines: No empty lines (contiguous).
+    3. Validates that quiz result lines are properly formatted, recording
+       statistics about the cleaning process in the stats dict.
+    
+    Yields cleaned lines one at a time as text.
     """
-    cleaned_lines = []
-    remove_prefixes = ('🖊', '🏆', '⏱', '🤓')
+    last_type = None
+    line_num = 0
+    valid_results = 0
+    invalid_lines = []
     
-    for line in lines:
-        stripped = line.strip()
-        
-        # Debug: print first few lines
-        if len(cleaned_lines) < 5:
-            print(f"DEBUG: line='{stripped}' [len={len(stripped)}]")
+    for raw in lines:
+        stripped = raw.strip()
+        if stripped and stripped[0] in _UNICODE_SPACE_LEADS:
+            match = _UNICODE_SPACE_RE.match(stripped)
+            if match:
+                stripped = stripped[match.end():]
         
         # Skip metadata lines
-        if stripped.startswith(remove_prefixes):
+        if stripped.startswith(_REMOVE_PREFIXES):
             continue
         # Skip empty chapter headers like "ምዕራፍ 1 እና 2" and similar patterns
         # Check for the exact Ethiopian characters
-        if 'ምዕራፍ' in stripped:
+        if _CHAPTER_HEADER in stripped:
             continue
         # Skip quiz title lines that contain "Top results in the quiz"
-        if 'Top results in the quiz' in stripped:
+        if b'Top results in the quiz' in stripped:
             continue
         # Skip lines starting with "Yonas Aye"
-        if 'Yonas Aye' in stripped:
-            print(f"DEBUG: Skipping Yonas line: '{stripped}'")
+        if b'Yonas Aye' in stripped:
             continue
+        
+        line = raw.decode('utf-8')
+        stripped_line = line.strip()
         # Skip completely empty lines
-        if not stripped:
+        if not stripped_line:
             continue
-        # Keep everything else (quiz results, etc.)
-        cleaned_lines.append(line)
-    
-    return cleaned_lines
-
-def get_line_type(text):
-    """Classify line type for formatting purposes."""
-    if not text.strip():
-        return 'EMPTY'
-    if text.strip().startswith('🥇'):
-        return 'GOLD'
-    if re.match(r'^\s*\d+\.', text):
-        return 'NUMBER'
-    return 'OTHER'
-
-def add_formatting_spaces(lines):
-    """
-    Manages spacing between lines:
-    1. Between a Numbered line and a Gold (🥇) line: Force 2 empty lines.
-    2. Between consecutive numbered lines: Remove empty lines to keep list contiguous.
-    3. Otherwise: Preserve single empty lines or content.
-    """
-    final_lines = []
-    last_type = None
-    
-    for line in lines:
-        line_type = get_line_type(line)
+        # Normalize Windows line endings as text-mode reading would
+        if line.endswith('\r\n'):
+            line = line[:-2] + '\n'
+        
+        line_type = get_line_type(line, stripped_line)
         
-        # Determine spacing based on transition from last_type to current line_type
+        # Transition from Number to New Quiz (Gold) -> 2 empty lines
         if last_type == 'NUMBER' and line_type == 'GOLD':
-            # Transition from Number to New Quiz (Gold) -> 2 empty lines
-            final_lines.append('\n')
-            final_lines.append('\n')
-        elif last_type == 'NUMBER' and line_type == 'NUMBER':
-            # Transition from Number to Number -> No empty lines (contiguous)
-            pass
-        elif last_type is not None:
-            # Default behavior for other transitions
-            pass
-
-        # Append the line itself
-        final_lines.append(line)
-        last_type = line_type
-    
-    return final_lines
-
-def validate_quiz_results(lines):
-    """
-    Validate that quiz result lines are properly formatted.
-    Returns statistics about the cleaning process.
-    """
-    result_pattern = re.compile(r'^\s*(?:🥇|🥈|🥉|\d+\.)\s*(@\S+|[^\u2013\n]+)\s*\u2013\s*(\d+)\s*\((.*?)\)')
-    valid_results = []
-    invalid_lines = []
-    
-    for line_num, line in enumerate(lines, 1):
-        if line.strip() and get_line_type(line) in ['GOLD', 'NUMBER']:
-            if result_pattern.match(line):
-                valid_results.append(line_num)
+            yield '\n'
+            yield '\n'
+            line_num += 2
+        
+        # Validate quiz result lines
+        line_num += 1
+        if line_type in ('GOLD', 'NUMBER'):
+            if _RESULT_RE.match(line):
+                valid_results += 1
             else:
-                invalid_lines.append((line_num, line.strip()))
+                invalid_lines.append((line_num, stripped_line))
+        
+        # Keep everything else (quiz results, etc.)
+        yield line
+        last_type = line_type
     
-    return {
-        'total_lines': len(lines),
-        'valid_results': len(valid_results),
-        'invalid_lines': invalid_lines
-    }
+    stats['total_lines'] = line_num
+    stats['valid_results'] = valid_results
+    stats['invalid_lines'] = invalid_lines
 
-def clean_quiz_data_optimized(file_path, output_filename=None):
+def clean_quiz_data_optimized(file_path, output_filename=None, backup=False):
     """
     Optimized data cleaning that preserves all relevant quiz data.
+    The raw file is only read, so a backup copy is made only when requested.
     """
     # Check if file exists
     if not os.path.exists(file_path):
@@ -128,47 +142,47 @@ def clean_quiz_data_optimized(file_path, output_filename=None):
         output_filename = f"{input_name}_cleaned.txt"
     
     output_path = processed_dir / output_filename
+    # Stream into a temporary file so a failed run never leaves a partial output
+    temp_path = output_path.with_name(output_path.name + ".tmp")
     
-    # Create a backup of original file
-    backup_path = file_path + ".bak"
-    shutil.copy2(file_path, backup_path)
-    print(f"Backup created at {backup_path}")
+    # Create a backup of original file if requested
+    if backup:
+        backup_path = file_path + ".bak"
+        shutil.copy2(file_path, backup_path)
+        print(f"Backup created at {backup_path}")
 
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        print(f"Original file: {len(lines)} lines")
+        # Clean, format and validate in one pass, writing lines as they are produced
+        with open(file_path, 'rb', buffering=BUFFER_SIZE) as src, \
+             open(temp_path, 'w', encoding='utf-8', buffering=BUFFER_SIZE) as dst:
+            stats = {}
+            chunk = []
+            chunk_size = 0
+            for line in process_lines(src, stats):
+                chunk.append(line)
+                chunk_size += len(line)
+                if chunk_size >= WRITE_CHUNK_SIZE:
+                    dst.write(''.join(chunk))
+                    chunk.clear()
+                    chunk_size = 0
+            dst.write(''.join(chunk))
+        os.replace(temp_path, output_path)
 
-        # Step 1: Remove unwanted metadata
-        cleaned_lines = remove_metadata_lines(lines)
-        print(f"After metadata removal: {len(cleaned_lines)} lines")
-        
-        # Step 2: Apply formatting rules
-        final_lines = add_formatting_spaces(cleaned_lines)
-        print(f"After formatting: {len(final_lines)} lines")
-        
-        # Step 3: Validate results
-        stats = validate_quiz_results(final_lines)
+        print(f"After formatting: {stats['total_lines']} lines")
         print(f"Valid quiz results: {stats['valid_results']}")
         if stats['invalid_lines']:
             print(f"Warning: {len(stats['invalid_lines'])} potentially invalid lines:")
             for line_num, line in stats['invalid_lines'][:5]:  # Show first 5
                 print(f"  Line {line_num}: {line}")
         
-        # Write cleaned data to processed folder
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.writelines(final_lines)
-        
         print(f"Successfully cleaned and saved to: {output_path}")
         return str(output_path)
 
     except Exception as e:
         print(f"An error occurred: {e}")
-        # Restore from backup if something went wrong
-        if os.path.exists(backup_path):
-            shutil.copy2(backup_path, file_path)
-            print("Restored original file from backup due to error.")
+        # Discard the partial output, keeping any earlier cleaned file intact
+        if temp_path.exists():
+            temp_path.unlink()
         return None
 
 if __name__ == "__main__":
@@ -176,14 +190,16 @@ if __name__ == "__main__":
     script_dir = os.path.dirname(os.path.abspath(__file__))
     default_file = os.path.join(script_dir, '..', 'data', 'raw', 'MatMarkLuke.txt')
     
-    # Allow overriding via command line argument
-    if len(sys.argv) > 1:
-        file_path = sys.argv[1]
+    # Allow overriding via command line argument; pass --backup to keep a .bak copy
+    args = [arg for arg in sys.argv[1:] if arg != '--backup']
+    backup = len(args) < len(sys.argv) - 1
+    if args:
+        file_path = args[0]
     else:
         file_path = default_file
 
     print(f"Processing file: {file_path}")
-    result = clean_quiz_data_optimized(file_path)
+    result = clean_quiz_data_optimized(file_path, backup=backup)
     
     if result:
         print(f"\nCleaning completed successfully!")
@@ -0,0 +1,24 @@
+import pytest
+
+from convert_to_csv import parse_time_to_tenths
+
+
+# Expected values are the seconds returned by the original
+# parse_time_to_seconds, expressed in tenths of a second
+@pytest.mark.parametrize("time_str, expected", [
+    ('1 min 35 sec', 950),
+    ('45.6 sec', 456),
+    ('30 sec', 300),
+    ('2 min', 1200),
+    ('1 MIN 5.5 SEC', 655),
+    ('2 mins 3 secs', 1230),
+    ('1 min, 35 sec', 950),
+    ('1 hr 2 min 3 sec', 1230),
+    ('35 sec 1 min', 950),
+    ('Q2: 45 sec', 450),
+    ('', 0),
+    ('n/a', 0),
+    (None, 0),
+])
+def test_parse_time_to_tenths(time_str, expected):
+    assert parse_time_to_tenths(time_str) == expected
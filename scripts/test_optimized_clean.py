@@ -0,0 +1,12 @@
+from optimized_clean import process_lines
+
+
+def test_process_lines_drops_metadata_after_unicode_whitespace():
+    raw = [
+        '\u00a0🖊 ምዕራፍ 1 እና 2\n'.encode('utf-8'),
+        '\u3000🏆 Top results\n'.encode('utf-8'),
+        '🥇 @alice – 10 (50 sec)\n'.encode('utf-8'),
+    ]
+    stats = {}
+    assert list(process_lines(raw, stats)) == ['🥇 @alice – 10 (50 sec)\n']
+    assert stats['valid_results'] == 1